@@ -1,7 +1,5 @@
 from pathlib import Path
-import re
-from setuptools import setup, find_packages
-from typing import List
+from setuptools import setup
 
 
 def read(*parts: str) -> str:
@@ -11,20 +9,12 @@ def read(*parts: str) -> str:
 
 
 def find_version(*parts: str) -> str:
-    vers_file = read(*parts)
-    match = re.search(r'^__version__ = "(\d+.\d+.\d+)"', vers_file, re.M)
-    if match is not None:
-        return match.group(1)
+    for line in read(*parts).splitlines():
+        if line.startswith("__version__"):
+            return line.split('"')[1]
     raise RuntimeError("Unable to find version string.")
 
 
-def get_assests(*parts: str) -> List[str]:
-    asset_dir = Path(__file__).parent.joinpath(*parts)
-    out = [str(d.relative_to(asset_dir.parent)) for d in asset_dir.rglob("*")]
-    print(out)
-    return out
-
-
 meta = dict(
     description="View and manipulate geojson files",
     url="https://github.com/antarcticrainforest/geojson-viewer",
@@ -34,7 +24,7 @@ meta = dict(
     long_description_content_type="text/markdown",
     license="BSD-3-Clause",
     python_requires=">=3.7",
-    package_data={"": get_assests("src", "geojson_viewer", "assets")},
+    package_data={"geojson_viewer": ["assets/*", "assets/**/*"]},
     project_urls={
         "Issues": "https://github.com/antarcticrainforest/geojson-viewer/issues",
         "Source": "https://github.com/antarcticrainforest/geojson-viewer",
@@ -61,6 +51,7 @@ meta = dict(
         "dash",
         "geopandas",
         "gunicorn",
+        "orjson",
         "pandas",
     ],
     extras_require={
@@ -77,4 +68,4 @@ meta = dict(
     },
 )
 
-setup(name="geojson_viewer", packages=find_packages("src"), **meta)
+setup(name="geojson_viewer", packages=["geojson_viewer"], **meta)
@@ -3,11 +3,6 @@
 from __future__ import annotations
 import argparse
 
-from dash import Dash, dcc, html
-
-from .layout import display_tab, edit_tab
-from .server import app
-
 __version__ = "2022.10.1"
 
 
@@ -53,6 +48,13 @@ def run_server(
     kwargs:
         Additional keyword arguments
     """
+    # Import the dash app only here, the heavy imports (dash, plotly,
+    # geopandas) would otherwise slow down cli calls like --help.
+    from dash import dcc, html
+
+    from .layout import display_tab, edit_tab
+    from .server import app
+
     app.layout = html.Div(
         children=[
             dcc.Tabs(
@@ -1,7 +1,6 @@
 """Definitions of the dash layout."""
 
-from pathlib import Path
-from dash import Dash, dcc, dash_table, html
+from dash import dcc, dash_table, html
 
 
 display_tab = [
@@ -3,53 +3,61 @@
 from __future__ import annotations
 from datetime import datetime
 from pathlib import Path
-import json
-from tempfile import NamedTemporaryFile
-from typing import Any, cast
+from typing import Any, cast, TYPE_CHECKING
 
 from dash import (
     ctx,
     Dash,
     dcc,
-    dash_table,
     exceptions,
     html,
     Input,
     Output,
     State,
 )
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-import geopandas as gp
-from .utils import GeoJsonFile, load_geojson, logger
+from .utils import GeoJsonFile, dump_geojson, load_geojson, logger
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 app = Dash("geojson-viewer", assets_folder=Path(__file__).parent / "assets")
 
 
 def _clear_fig(
-    fig: go.Figure | None = None,
     text: str = "Choose 2 columns and click the view button to compare.",
-) -> go.Figure:
-    fig = go.Figure(fig or {})
-    fig.update_layout(
-        plot_bgcolor="white",
-        xaxis=go.layout.XAxis(showticklabels=False),
-        yaxis=go.layout.YAxis(showticklabels=False),
-    )
-    fig.add_annotation(
-        x=0.5,
-        y=0.5,
-        xref="paper",
-        yref="paper",
-        text=text,
-        showarrow=False,
-        align="center",
-        font=dict(size=16),
-    )
-    return fig
+) -> dict[str, Any]:
+    # Plain figure dict, this avoids plotly's validation of go.Figure.
+    return {
+        "data": [],
+        "layout": {
+            "plot_bgcolor": "white",
+            "xaxis": {"showticklabels": False},
+            "yaxis": {"showticklabels": False},
+            "annotations": [
+                {
+                    "x": 0.5,
+                    "y": 0.5,
+                    "xref": "paper",
+                    "yref": "paper",
+                    "text": text,
+                    "showarrow": False,
+                    "align": "center",
+                    "font": {"size": 16},
+                }
+            ],
+        },
+    }
 
 
+# The placeholder figures never change, create them only once.
+_EMPTY_FIG_DICT = _clear_fig()
+_MESSAGE_FIG_DICTS = {
+    text: _clear_fig(text=text)
+    for text in (
+        "You should select only 2 data keys.",
+        "Columns must be different",
+    )
+}
 geo_json_obj = GeoJsonFile()
 
 
@@ -88,6 +96,28 @@ def create_columns(
     tuple:
         The elements of the view box that is displayed for editing the data
     """
+    if (
+        ctx.triggered_id is None
+        and geojson_file is None
+        and upload_content is None
+        and geo_json_obj.data_frame is None
+    ):
+        # Initial call, the layout already shows everything there is.
+        raise exceptions.PreventUpdate
+    if (
+        ctx.triggered_id == "reset-button"
+        and geo_json_obj.data_frame is not None
+    ):
+        # Only the table has to be reset, the data is already loaded.
+        return (
+            geo_json_obj.columns,
+            html.P("", id="load-status"),
+            geo_json_obj.to_viewbox(),
+            False,
+            False,
+            geojson_file or "",
+            [dcc.Graph(id="graph", figure=_EMPTY_FIG_DICT)],
+        )
     status_msg = ""
     disable_button = False
     if geojson_file is None and upload_content is None:
@@ -98,7 +128,7 @@ def create_columns(
             True,
             True,
             "",
-            [dcc.Graph(id="graph", figure=_clear_fig())],
+            [dcc.Graph(id="graph", figure=_EMPTY_FIG_DICT)],
         )
     if ctx.triggered_id == "load-button" or upload_content is not None:
         if ctx.triggered_id == "load-button":
@@ -115,21 +145,16 @@ def create_columns(
             logger.error(error)
             status_msg = "Error: Could not load data content"
     if geo_json_obj.data_frame is None:
-        columns = []
         disable_button = True
-    else:
-        columns = [
-            c for c in geo_json_obj.data_frame.columns if c != "geometry"
-        ]
 
     return (
-        columns,
+        geo_json_obj.columns,
         html.P(status_msg, id="load-status", style={"color": "red"}),
         geo_json_obj.to_viewbox(),
         disable_button,
         disable_button,
         geojson_file or "",
-        [dcc.Graph(id="graph", figure=_clear_fig())],
+        [dcc.Graph(id="graph", figure=_EMPTY_FIG_DICT)],
     )
 
 
@@ -144,7 +169,7 @@ def display_choropleth(
     columns: list[str | None] | None,
     table_data: list[dict[str, Any]],
     *args: int,
-) -> tuple[go.Figure, str]:
+) -> tuple[go.Figure | dict[str, Any], str]:
     """Create the plot of the geojson data.
 
     The data that is displayed is taken from the table box rather than
@@ -170,22 +195,22 @@ def display_choropleth(
     """
 
     if columns is None or len(columns) != 2 or geo_json_obj.data_frame is None:
-        return _clear_fig(), ""
+        return _EMPTY_FIG_DICT, ""
     if len(columns) > 2:
-        return _clear_fig(text="You should select only 2 data keys.")
+        return _MESSAGE_FIG_DICTS["You should select only 2 data keys."], ""
     if columns[0] is None or columns[1] is None or columns[0] == columns[1]:
-        return _clear_fig(), ""
+        return _EMPTY_FIG_DICT, ""
     if columns[0] == columns[1]:
-        return _clear_fig(text="Columns must be different"), ""
+        return _MESSAGE_FIG_DICTS["Columns must be different"], ""
+
+    import plotly.express as px
 
     location, color = cast(list[str], columns)
-    data_frame = pd.DataFrame(table_data).astype(geo_json_obj.dtypes)
+    data_frame = geo_json_obj.frame_from_records(table_data)
     try:
-        geojson = json.loads(
-            geo_json_obj.data_frame[[color, location, "geometry"]].to_json()
-        )
+        geojson = geo_json_obj.geojson(location, table_data)
     except KeyError:
-        return _clear_fig(), ""
+        return _EMPTY_FIG_DICT, ""
     fig = px.choropleth(
         data_frame,
         geojson=geojson,
@@ -221,17 +246,16 @@ def save_data(
     table_columns: list[str]
         The columns for the ``table_data```
     """
+    import geopandas as gp
+
     if geo_json_obj.data_frame is None:
         raise exceptions.PreventUpdate
     data_frame = gp.GeoDataFrame(
-        pd.DataFrame(table_data).astype(geo_json_obj.dtypes),
+        geo_json_obj.frame_from_records(table_data),
         geometry=geo_json_obj.data_frame["geometry"],
         crs=geo_json_obj.data_frame.crs,
     )
-    with NamedTemporaryFile(suffix=".geojson") as temp_f:
-        data_frame.to_file(temp_f.name, driver="GeoJSON")
-        with open(temp_f.name, encoding="utf-8") as f_obj:
-            content = f_obj.read()
+    content = dump_geojson(data_frame)
     time = datetime.now().strftime("%Y%m%dT%H%M")
     out_file = f"geojsonviewer-{time}.geojson"
     return dict(content=content, filename=out_file)
@@ -1,28 +1,38 @@
 """Collection of utilities to run and setup the geojson viewer app."""
 from __future__ import annotations
 import base64
-from dataclasses import dataclass
+from datetime import date, time
+from functools import lru_cache
 import io
 import logging
+from operator import itemgetter
 from pathlib import Path
 from urllib.parse import urlparse
-from typing import Any
+from urllib.request import urlopen
+from typing import Any, TYPE_CHECKING
 
-import geopandas as gp
 from dash import dash_table, html
+import numpy as np
+import orjson
+import pandas as pd
+
+if TYPE_CHECKING:
+    import geopandas as gp
 
 logging.basicConfig(
     format="%(name)s - %(levelname)s - %(message)s", level=logging.INFO
 )
 logger = logging.getLogger("geojson-viewer")
+# Authorities that can be represented as OGC URN in the geojson crs member.
+_OGC_AUTHORITIES = ("EDCS", "EPSG", "OGC", "SI", "UCUM")
 
 
-@dataclass
 class GeoJsonFile:
     """Class holding all information of the loaded geojson file.
 
     This class keeps track of the loaded geojson file and has methods
-    that are able to modify/convert the data.
+    that are able to modify/convert the data. Data that is derived from
+    the loaded data frame is cached until a new data frame is assigned.
 
     Parameters
     ----------
@@ -30,7 +40,28 @@ class GeoJsonFile:
         Ad pandas DataFrame representation of the geojson file.
     """
 
-    data_frame: gp.geodataframe.GeoDataFrame | None = None
+    def __init__(
+        self, data_frame: gp.geodataframe.GeoDataFrame | None = None
+    ) -> None:
+        self._version = 0
+        self._viewbox_cache: tuple[int, list[Any]] | None = None
+        self._columns_cache: tuple[int, list[str]] | None = None
+        self._dtypes_cache: tuple[int, dict[str, Any]] | None = None
+        self._geojson_cache: tuple[int, dict[str, Any]] | None = None
+        self.data_frame = data_frame
+
+    @property
+    def data_frame(self) -> gp.geodataframe.GeoDataFrame | None:
+        """The pandas DataFrame representation of the geojson file."""
+        return self._data_frame
+
+    @data_frame.setter
+    def data_frame(
+        self, data_frame: gp.geodataframe.GeoDataFrame | None
+    ) -> None:
+        # Bumping the version invalidates all cached derived data.
+        self._data_frame = data_frame
+        self._version += 1
 
     def dash_data_table_from_dataframe(
         self, columns: list[str]
@@ -48,26 +79,100 @@ class GeoJsonFile:
         list: Geojson data in dash_table format
         """
 
-        out_table: list[dict[str, Any]] = []
         if self.data_frame is None:
-            return out_table
-        for line in self.data_frame[columns].values:
-            out_table.append(dict(zip(columns, line)))
-        return out_table
+            return []
+        keys = tuple(columns)
+        return [
+            dict(zip(keys, row))
+            for row in self.data_frame[columns].itertuples(
+                index=False, name=None
+            )
+        ]
 
     @property
     def columns(self) -> list[str]:
         """Get all column names excpet geometry."""
-        if self.data_frame is None:
-            return []
-        return [c for c in self.data_frame.columns if c != "geometry"]
+        if self._columns_cache and self._columns_cache[0] == self._version:
+            return self._columns_cache[1]
+        columns: list[str] = []
+        if self.data_frame is not None:
+            columns = self.data_frame.columns.drop(
+                "geometry", errors="ignore"
+            ).tolist()
+        self._columns_cache = (self._version, columns)
+        return columns
 
     @property
-    def dtypes(self) -> dict[str, type]:
+    def dtypes(self) -> dict[str, Any]:
         """Get the data types of each column."""
+        if self._dtypes_cache and self._dtypes_cache[0] == self._version:
+            return self._dtypes_cache[1]
+        dtypes: dict[str, Any] = {}
+        if self.data_frame is not None:
+            dtypes = self.data_frame.dtypes.drop(
+                "geometry", errors="ignore"
+            ).to_dict()
+        self._dtypes_cache = (self._version, dtypes)
+        return dtypes
+
+    def frame_from_records(
+        self, records: list[dict[str, Any]]
+    ) -> pd.DataFrame:
+        """Convert dash_table data back to a data frame.
+
+        The columns are created with the data types of the loaded geojson
+        data, which avoids creating intermediate object columns.
+
+        Parameters
+        ----------
+        records: list[dict]
+            The (possibly user modified) data of the dash_table.
+
+        Returns
+        -------
+        pandas.DataFrame: The table data as data frame
+        """
+        return pd.DataFrame(
+            build_columnar(
+                records, tuple(self.dtypes), tuple(self.dtypes.values())
+            ),
+            copy=False,
+        )
+
+    def geojson(
+        self, location: str, records: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Get the geojson representation of the geometries.
+
+        The geometries of the loaded data are only converted once, only the
+        ``location`` entries of the ``records`` are added to the properties
+        of the features. This is all that is needed to match the features
+        with the (possibly user modified) data that is displayed.
+
+        Parameters
+        ----------
+        location: str
+            The name of the column identifying each feature.
+        records: list[dict]
+            The dash_table data holding the locations of the features.
+
+        Returns
+        -------
+        dict: The FeatureCollection of the loaded geojson data
+        """
         if self.data_frame is None:
-            return {}
-        return {c: self.data_frame[c].dtype for c in self.columns}
+            return {"type": "FeatureCollection", "features": []}
+        if not self._geojson_cache or self._geojson_cache[0] != self._version:
+            self._geojson_cache = (
+                self._version,
+                self.data_frame[["geometry"]].__geo_interface__,
+            )
+        skeleton = self._geojson_cache[1]
+        features = [
+            {**feature, "properties": {location: record[location]}}
+            for feature, record in zip(skeleton["features"], records)
+        ]
+        return {**skeleton, "features": features}
 
     def to_viewbox(self) -> list[Any]:
         """Create the table div box that enables editing the geojson data.
@@ -80,6 +185,13 @@ class GeoJsonFile:
         list: A list of items that are displayed in the table editing view
               box.
         """
+        if self._viewbox_cache and self._viewbox_cache[0] == self._version:
+            return self._viewbox_cache[1]
+        viewbox = self._create_viewbox()
+        self._viewbox_cache = (self._version, viewbox)
+        return viewbox
+
+    def _create_viewbox(self) -> list[Any]:
         if self.data_frame is None:
             return [
                 html.P(
@@ -89,7 +201,7 @@ class GeoJsonFile:
                 html.Br(),
                 dash_table.DataTable(id="table"),
             ]
-        columns = [c for c in self.data_frame.columns if c != "geometry"]
+        columns = self.columns
         return [
             html.P("To edit: click cells, adjust and press enter"),
             html.Br(),
@@ -102,6 +214,85 @@ class GeoJsonFile:
         ]
 
 
+def build_columnar(
+    records: list[dict[str, Any]],
+    col_names: tuple[str, ...],
+    col_dtypes: tuple[Any, ...],
+) -> dict[str, Any]:
+    """Convert row records to column arrays of given data types.
+
+    Parameters
+    ----------
+    records: list[dict]
+        The row records that are converted.
+    col_names: tuple[str]
+        The names of the columns that are extracted from the records.
+    col_dtypes: tuple
+        The (numpy or pandas extension) data types of the columns.
+
+    Returns
+    -------
+    dict: Column names and their values as numpy/pandas arrays
+    """
+    columns: dict[str, Any] = {}
+    for name, dtype in zip(col_names, col_dtypes):
+        values = list(map(itemgetter(name), records))
+        if isinstance(dtype, np.dtype) and dtype.kind == "O":
+            # np.array would turn sequence cell values into extra dimensions
+            array = np.empty(len(values), dtype=dtype)
+            for num, value in enumerate(values):
+                array[num] = value
+            columns[name] = array
+        elif isinstance(dtype, np.dtype):
+            columns[name] = np.array(values, dtype=dtype)
+        else:
+            columns[name] = pd.array(values, dtype=dtype)
+    return columns
+
+
+def _json_default(obj: Any) -> str:
+    """Serialise objects that orjson can't handle natively."""
+    if isinstance(obj, (date, time)):
+        # pandas Timestamps are datetime subclasses, orjson rejects them.
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def dump_geojson(data_frame: gp.geodataframe.GeoDataFrame) -> str:
+    """Convert a geopandas dataframe to a geojson string.
+
+    Like the GDAL GeoJSON driver, the index is not written as feature id
+    and the crs is added if it isn't the geojson default (EPSG:4326).
+
+    Parameters
+    ----------
+    data_frame: geopandas.geodataframe.GeoDataFrame
+        The geopandas dataframe that is converted.
+
+    Returns
+    -------
+    str: The geojson representation of the data
+    """
+    geo: dict[str, Any] = {
+        "type": "FeatureCollection",
+        "features": list(data_frame.iterfeatures(na="null", drop_id=True)),
+    }
+    crs = data_frame.crs
+    if crs is not None and not crs.equals("epsg:4326"):
+        auth_crs = crs.to_authority()
+        if auth_crs is None or auth_crs[0] not in _OGC_AUTHORITIES:
+            logger.warning("Could not add crs %s to the geojson data", crs)
+        else:
+            authority, code = auth_crs
+            geo["crs"] = {
+                "type": "name",
+                "properties": {"name": f"urn:ogc:def:crs:{authority}::{code}"},
+            }
+    return orjson.dumps(
+        geo, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY
+    ).decode("utf-8")
+
+
 def load_geojson(
     inp_path: str | None, upload_content: str | None
 ) -> gp.geodataframe.GeoDataFrame:
@@ -110,26 +301,42 @@ def load_geojson(
 
     Parameters
     ----------
-    inp_path: str, io.StringIO
-        Path/buffer content of the resource
+    inp_path: str
+        Path (file path or url) of the resource
+    upload_content: str
+        Base64 encoded content of an uploaded file
 
     Returns
     -------
     geopandas.geodataframe.GeoDataFrame: Loaded geopandas dataframe
     """
-    content: str | io.StringIO = ""
+    import geopandas as gp
+
+    content: str | io.BytesIO = ""
     if inp_path is not None:
         content = inp_path.strip()
         parsed_url = urlparse(content)
         if not parsed_url.netloc and not parsed_url.scheme:
             # Assume this this is a path on the file system
             content = str(Path(content).expanduser().absolute())
+        elif parsed_url.scheme in ("http", "https"):
+            content = io.BytesIO(_load_url(content))
     elif upload_content is not None:
-        content = io.StringIO(read_upload_content(upload_content))
+        content = io.BytesIO(read_upload_content(upload_content))
     return gp.read_file(content)
 
 
-def read_upload_content(content: str) -> str:
+@lru_cache(maxsize=8)
+def _load_url(url: str, timeout: float = 30) -> bytes:
+    """Download the content of a url, recently loaded urls are cached.
+
+    A cached url is never downloaded again while the server is running.
+    """
+    with urlopen(url, timeout=timeout) as response:
+        return response.read()
+
+
+def read_upload_content(content: str) -> bytes:
     """Read upladed user content.
 
     Parameters
@@ -139,7 +346,7 @@ def read_upload_content(content: str) -> str:
 
     Returns
     -------
-    str: The uploaded user content
+    bytes: The uploaded user content
     """
-    _, content_string = content.split(",")
-    return base64.b64decode(content_string).decode("utf-8")
+    _, content_string = content.split(",", 1)
+    return base64.b64decode(content_string)